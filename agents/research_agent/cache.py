@@ -0,0 +1,114 @@
+import os
+import json
+import time
+import hashlib
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+class FileCache:
+    """Small on-disk TTL cache for upstream API responses.
+
+    Entries are stored as JSON files under `{root}/{namespace}/{md5(key)}.json`
+    with the shape `{"ts": <unix time>, "data": <payload>}`, so they survive
+    process restarts and are shared between workers on the same host.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or os.getenv("RESEARCH_CACHE_DIR", ".cache")
+
+    def _path(self, namespace: str, key: str) -> str:
+        digest = hashlib.md5(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.root, namespace, f"{digest}.json")
+
+    def get(self, namespace: str, key: str, ttl: float) -> Optional[Any]:
+        """
+        Return the cached payload for `key` if it is younger than `ttl` seconds
+
+        Args:
+            namespace: Sub-directory grouping entries (usually the endpoint)
+            key: Cache key, typically built from the request parameters
+            ttl: Maximum entry age in seconds
+
+        Returns:
+            The cached payload, or None on a miss, expiry or unreadable entry
+        """
+        try:
+            with open(self._path(namespace, key), "r", encoding="utf-8") as fh:
+                entry = json.load(fh)
+        except (OSError, ValueError):
+            return None
+        if time.time() - entry.get("ts", 0) > ttl:
+            return None
+        return entry.get("data")
+
+    def put(self, namespace: str, key: str, data: Any) -> None:
+        """
+        Store `data` under `key`, replacing any previous entry
+
+        Args:
+            namespace: Sub-directory grouping entries (usually the endpoint)
+            key: Cache key, typically built from the request parameters
+            data: JSON-serialisable payload
+        """
+        path = self._path(namespace, key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump({"ts": time.time(), "data": data}, fh)
+            # Atomic swap so concurrent readers never see a half-written file
+            os.replace(tmp, path)
+        except OSError:
+            # Caching is best-effort; a read-only filesystem must not break fetches
+            pass
+
+
+class MemoryCache:
+    """In-process LRU cache with per-lookup TTL.
+
+    Sits in front of `FileCache` so repeated identical lookups within one
+    process skip the file read and JSON decode entirely.
+    """
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def get(self, key: str, ttl: float) -> Optional[Any]:
+        """
+        Return the payload for `key` if it is younger than `ttl` seconds
+
+        Args:
+            key: Cache key
+            ttl: Maximum entry age in seconds
+
+        Returns:
+            The cached payload, or None on a miss or expiry
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        ts, data = entry
+        if time.time() - ts > ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return data
+
+    def put(self, key: str, data: Any) -> None:
+        """
+        Store `data` under `key`, evicting the least recently used entry when full
+
+        Args:
+            key: Cache key
+            data: Payload to store
+        """
+        self._entries[key] = (time.time(), data)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        self._entries.clear()
@@ -1,9 +1,147 @@
 import os
+import re
+import atexit
+import asyncio
+import functools
 import logging
-from typing import Optional, Dict, Any, List
+import threading
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, List, Tuple, Union
+from urllib.parse import quote
 from logging_config import get_logger
+from cache import FileCache, MemoryCache
 import httpx
-import statistics
+import numpy as np
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except Exception:
+    import json
+    _json_loads = json.loads
+
+try:
+    import ahocorasick
+except Exception:
+    ahocorasick = None
+
+
+# One pooled HTTP/2 client shared by every agent instance so repeat calls to
+# CoinGecko / NewsAPI reuse warm TLS connections instead of re-handshaking.
+_SHARED_HTTP = httpx.AsyncClient(
+    http2=True,
+    limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+    timeout=10.0,
+    headers={"accept-encoding": "gzip"},
+)
+
+# The async client's pool is bound to a single event loop, and the sync entry
+# points are called from inside FastAPI's running loop (where asyncio.run is
+# not allowed), so all requests are driven by one background loop.
+_LOOP = asyncio.new_event_loop()
+threading.Thread(target=_LOOP.run_forever, name="research-http", daemon=True).start()
+
+
+def _run(coro):
+    """Run `coro` on the background loop and block until it completes."""
+    return asyncio.run_coroutine_threadsafe(coro, _LOOP).result()
+
+
+atexit.register(lambda: _run(_SHARED_HTTP.aclose()))
+
+# Fully baked CoinGecko URLs. The same (ids, currency) pairs recur on every
+# kickoff, so formatting and query encoding are done once per pair.
+@functools.lru_cache(maxsize=512)
+def _simple_price_url(base: str, ids_csv: str, vs_currency: str) -> str:
+    return (
+        f"{base}/simple/price?ids={quote(ids_csv, safe=',')}"
+        f"&vs_currencies={quote(vs_currency)}&include_24hr_change=true"
+    )
+
+
+@functools.lru_cache(maxsize=512)
+def _market_chart_url(base: str, coingecko_id: str, vs_currency: str) -> str:
+    return f"{base}/coins/{quote(coingecko_id)}/market_chart?vs_currency={quote(vs_currency)}&days=7"
+
+
+# Process-wide memo of decoded NewsAPI headlines. Agents are created per job,
+# so this lives at module scope; call `_NEWS_MEMO.clear()` to invalidate.
+_NEWS_MEMO = MemoryCache(maxsize=128)
+
+# Sentiment vocabularies, matched on word boundaries so e.g. "surge" does not
+# fire on "surgery". Group 1 captures positive words, group 2 negative ones.
+_POSITIVE_WORDS = frozenset({"gain", "gains", "bull", "bullish", "surge", "up", "rally", "record", "beat"})
+_NEGATIVE_WORDS = frozenset({"loss", "losses", "bear", "bearish", "dump", "down", "drop", "fall", "slump"})
+_SENTIMENT_RE = re.compile(
+    r"\b(?:(" + "|".join(sorted(_POSITIVE_WORDS)) + r")|(" + "|".join(sorted(_NEGATIVE_WORDS)) + r"))\b"
+)
+
+# When pyahocorasick is available both vocabularies live in one automaton, so
+# the text is scanned exactly once regardless of vocabulary size. Values are
+# (polarity, word length) so hits can be checked against word boundaries.
+if ahocorasick is not None:
+    _SENTIMENT_AC = ahocorasick.Automaton()
+    for _word in _POSITIVE_WORDS:
+        _SENTIMENT_AC.add_word(_word, (1, len(_word)))
+    for _word in _NEGATIVE_WORDS:
+        _SENTIMENT_AC.add_word(_word, (-1, len(_word)))
+    _SENTIMENT_AC.make_automaton()
+else:
+    _SENTIMENT_AC = None
+
+# Joins a batch of texts for a single scan; made of non-word characters so no
+# keyword can match across two texts.
+_TEXT_SEPARATOR = "\n\x00\n"
+
+
+def _is_word_char(c: str) -> bool:
+    return c.isalnum() or c == "_"
+
+
+def _sentiment_hits(low: str) -> Tuple[List[int], List[int]]:
+    """Return start offsets and polarities (+1/-1) of keyword hits in lowercased `low`."""
+    starts: List[int] = []
+    polarities: List[int] = []
+    if _SENTIMENT_AC is None:
+        for m in _SENTIMENT_RE.finditer(low):
+            starts.append(m.start())
+            polarities.append(1 if m.group(1) is not None else -1)
+        return starts, polarities
+
+    last = len(low) - 1
+    for end, (polarity, length) in _SENTIMENT_AC.iter(low):
+        start = end - length + 1
+        # Same semantics as the regex `\b...\b`: skip hits inside longer words
+        if (start > 0 and _is_word_char(low[start - 1])) or (end < last and _is_word_char(low[end + 1])):
+            continue
+        starts.append(start)
+        polarities.append(polarity)
+    return starts, polarities
+
+
+def _decision_kernel(change_24: np.ndarray, change_7: np.ndarray, news_score: np.ndarray) -> Dict[str, np.ndarray]:
+    """Score N tokens at once from their price moves and news sentiment.
+
+    Inputs are float arrays of shape [N] with NaN for missing price data
+    (NaN fails every comparison, so it contributes no signal). Returns the
+    per-signal masks, the combined `score`, and the `action` and its
+    `confidence` per token.
+    """
+    masks = {
+        "24h_up": change_24 > 3,
+        "24h_down": change_24 < -3,
+        "7d_up": change_7 > 5,
+        "7d_down": change_7 < -5,
+    }
+    score = (
+        0.5 * masks["24h_up"] - 0.5 * masks["24h_down"]
+        + 1.0 * masks["7d_up"] - 1.0 * masks["7d_down"]
+        + news_score
+    )
+    action = np.select([score >= 1.0, score <= -1.0], ["buy", "sell"], default="hold")
+    # Conviction grows with |score| for buy/sell, capped at 0.9; hold is flat
+    confidence = np.where(action == "hold", 0.5, np.minimum(0.9, 0.3 + np.abs(score) / 6))
+    return {**masks, "score": score, "action": action, "confidence": confidence}
 
 
 class MarketResearchAgent:
@@ -19,10 +157,18 @@ class MarketResearchAgent:
     """
 
     COINGECKO_BASE = "https://api.coingecko.com/api/v3"
-
-    def __init__(self, logger: Optional[logging.Logger] = None):
+    # `/simple/price` accepts up to 100 comma-separated ids per request.
+    SIMPLE_PRICE_MAX_IDS = 100
+    # Upper bound on concurrent `/market_chart` requests in a batch.
+    CHART_CONCURRENCY = 8
+    # Seconds a cached price / news response stays fresh.
+    PRICE_CACHE_TTL = float(os.getenv("PRICE_CACHE_TTL", "60"))
+    NEWS_CACHE_TTL = float(os.getenv("NEWS_CACHE_TTL", "600"))
+
+    def __init__(self, logger: Optional[logging.Logger] = None, cache: Optional[FileCache] = None):
         self.logger = logger or get_logger(__name__)
-        self.http = httpx.Client(timeout=10.0)
+        self.http = _SHARED_HTTP
+        self.cache = cache or FileCache()
         self.logger.info("MarketResearchAgent initialized")
 
     def fetch_price(self, coingecko_id: str, vs_currency: str = "usd") -> Dict[str, Any]:
@@ -30,60 +176,141 @@ class MarketResearchAgent:
 
         Returns a dict with `current_price`, `change_24h_pct`, `change_7d_pct`, `avg_volume_7d`.
         """
-        try:
-            # Current price
-            resp = self.http.get(f"{self.COINGECKO_BASE}/simple/price", params={
-                "ids": coingecko_id,
-                "vs_currencies": vs_currency,
-                "include_24hr_change": "true"
-            })
-            resp.raise_for_status()
-            price_data = resp.json().get(coingecko_id, {})
+        return _run(self._fetch_price_async(coingecko_id, vs_currency))
 
-            # Market chart for 7 days (prices and volumes)
-            chart = self.http.get(f"{self.COINGECKO_BASE}/coins/{coingecko_id}/market_chart", params={
-                "vs_currency": vs_currency,
-                "days": 7
-            })
-            chart.raise_for_status()
-            chart_json = chart.json()
-
-            prices = [p[1] for p in chart_json.get("prices", [])]
-            volumes = [v[1] for v in chart_json.get("total_volumes", [])]
-
-            change_7d = None
-            if prices and len(prices) >= 2:
-                change_7d = (prices[-1] - prices[0]) / prices[0] * 100 if prices[0] != 0 else None
-
-            return {
-                "current_price": price_data.get(vs_currency),
-                "change_24h_pct": price_data.get(f"{vs_currency}_24h_change"),
-                "change_7d_pct": change_7d,
-                "avg_volume_7d": statistics.mean(volumes) if volumes else None,
-                "raw_prices": prices,
-                "raw_volumes": volumes,
-            }
-        except Exception as e:
-            self.logger.warning("CoinGecko fetch failed: %s", str(e))
-            return {}
+    def fetch_prices(self, coingecko_ids: List[str], vs_currency: str = "usd") -> Dict[str, Dict[str, Any]]:
+        """Batched `fetch_price` for a watchlist of CoinGecko ids.
+
+        Spot prices for all ids come from one `/simple/price?ids=a,b,c` request
+        (chunked at `SIMPLE_PRICE_MAX_IDS`) and the 7d charts are fetched
+        concurrently. Returns a dict keyed by id; ids that failed map to `{}`.
+        """
+        return _run(self._fetch_prices_async(coingecko_ids, vs_currency))
+
+    async def _fetch_price_async(self, coingecko_id: str, vs_currency: str = "usd") -> Dict[str, Any]:
+        # Current price and 7 day market chart are independent, so both
+        # requests are in flight at the same time.
+        prices = await self._fetch_prices_async([coingecko_id], vs_currency)
+        return prices.get(coingecko_id, {})
+
+    async def _fetch_prices_async(self, coingecko_ids: List[str], vs_currency: str = "usd") -> Dict[str, Dict[str, Any]]:
+        out: Dict[str, Dict[str, Any]] = {}
+        ids = []
+        for cg_id in dict.fromkeys(coingecko_ids):
+            cached = self.cache.get("price", f"price:{cg_id}:{vs_currency}", ttl=self.PRICE_CACHE_TTL)
+            if cached is not None:
+                out[cg_id] = cached
+            else:
+                ids.append(cg_id)
+        if not ids:
+            return out
+        batches = [ids[i:i + self.SIMPLE_PRICE_MAX_IDS] for i in range(0, len(ids), self.SIMPLE_PRICE_MAX_IDS)]
+        chart_slots = asyncio.Semaphore(self.CHART_CONCURRENCY)
+
+        async def chart(cg_id: str) -> Dict[str, Any]:
+            async with chart_slots:
+                return await self._get_market_chart(cg_id, vs_currency)
+
+        results = await asyncio.gather(
+            *(self._get_simple_prices(batch, vs_currency) for batch in batches),
+            *(chart(cg_id) for cg_id in ids),
+            return_exceptions=True,
+        )
+        price_results, chart_results = results[:len(batches)], results[len(batches):]
+
+        price_data: Dict[str, Any] = {}
+        failed = set()
+        for batch, result in zip(batches, price_results):
+            if isinstance(result, Exception):
+                self.logger.warning("CoinGecko fetch failed: %s", str(result))
+                failed.update(batch)
+            else:
+                price_data.update(result)
+
+        for cg_id, chart_json in zip(ids, chart_results):
+            if isinstance(chart_json, Exception):
+                self.logger.warning("CoinGecko fetch failed: %s", str(chart_json))
+                out[cg_id] = {}
+            elif cg_id in failed:
+                out[cg_id] = {}
+            else:
+                try:
+                    out[cg_id] = self._summarize_price(price_data.get(cg_id, {}), chart_json, vs_currency)
+                except Exception as e:
+                    # A malformed upstream payload should not take down the whole report
+                    self.logger.warning("CoinGecko fetch failed: %s", str(e))
+                    out[cg_id] = {}
+                    continue
+                # A spot price missing from the batch response would pin "no price" for the whole TTL
+                if cg_id in price_data:
+                    self.cache.put("price", f"price:{cg_id}:{vs_currency}", out[cg_id])
+        return out
+
+    async def _get_simple_prices(self, coingecko_ids: List[str], vs_currency: str) -> Dict[str, Any]:
+        resp = await self.http.get(_simple_price_url(self.COINGECKO_BASE, ",".join(coingecko_ids), vs_currency))
+        resp.raise_for_status()
+        return _json_loads(resp.content)
+
+    async def _get_market_chart(self, coingecko_id: str, vs_currency: str) -> Dict[str, Any]:
+        # Market chart for 7 days (prices and volumes)
+        chart = await self.http.get(_market_chart_url(self.COINGECKO_BASE, coingecko_id, vs_currency))
+        chart.raise_for_status()
+        return _json_loads(chart.content)
+
+    @staticmethod
+    def _summarize_price(price_data: Dict[str, Any], chart_json: Dict[str, Any], vs_currency: str) -> Dict[str, Any]:
+        # Chart series are [[timestamp, value], ...]; keep only the value column
+        prices = np.asarray(chart_json.get("prices") or (), dtype=np.float64).reshape(-1, 2)[:, 1]
+        volumes = np.asarray(chart_json.get("total_volumes") or (), dtype=np.float64).reshape(-1, 2)[:, 1]
+
+        change_7d = None
+        if prices.size >= 2 and prices[0] != 0:
+            change_7d = float((prices[-1] - prices[0]) / prices[0] * 100)
+
+        return {
+            "current_price": price_data.get(vs_currency),
+            "change_24h_pct": price_data.get(f"{vs_currency}_24h_change"),
+            "change_7d_pct": change_7d,
+            "avg_volume_7d": float(volumes.mean()) if volumes.size else None,
+            # Plain lists so the report stays JSON serialisable
+            "raw_prices": prices.tolist(),
+            "raw_volumes": volumes.tolist(),
+        }
 
     def fetch_news_headlines(self, query: str, news_api_key: Optional[str] = None, page_size: int = 5) -> List[str]:
         """Fetch a small set of news headlines using NewsAPI if key provided.
 
         Falls back to empty list if no key is present.
         """
+        return _run(self._fetch_news_headlines_async(query, news_api_key, page_size))
+
+    async def _fetch_news_headlines_async(self, query: str, news_api_key: Optional[str] = None, page_size: int = 5) -> List[str]:
         if not news_api_key:
             return []
+        # NewsAPI queries are case-insensitive, so normalise for better hit rates
+        cache_key = f"news:{query.lower()}:{page_size}"
+        memo = _NEWS_MEMO.get(cache_key, ttl=self.NEWS_CACHE_TTL)
+        if memo is not None:
+            return list(memo)
+        cached = self.cache.get("news", cache_key, ttl=self.NEWS_CACHE_TTL)
+        if cached is not None:
+            _NEWS_MEMO.put(cache_key, tuple(cached))
+            return cached
         try:
-            resp = self.http.get("https://newsapi.org/v2/everything", params={
+            resp = await self.http.get("https://newsapi.org/v2/everything", params={
                 "q": query,
                 "apiKey": news_api_key,
                 "pageSize": page_size,
                 "sortBy": "relevancy",
+                # Only headlines feed the sentiment score, so match on them alone
+                "searchIn": "title",
             })
             resp.raise_for_status()
-            items = resp.json().get("articles", [])
-            return [a.get("title", "") for a in items]
+            articles = _json_loads(resp.content).get("articles") or ()
+            headlines = [a["title"] for a in articles if a.get("title")]
+            self.cache.put("news", cache_key, headlines)
+            _NEWS_MEMO.put(cache_key, tuple(headlines))
+            return headlines
         except Exception as e:
             self.logger.warning("NewsAPI fetch failed: %s", str(e))
             return []
@@ -96,89 +323,116 @@ class MarketResearchAgent:
         if not texts:
             return {"score": 0.0, "positive": 0, "negative": 0, "neutral": 0}
 
-        positive_words = {"gain", "gains", "bull", "bullish", "surge", "up", "rally", "record", "beat"}
-        negative_words = {"loss", "losses", "bear", "bearish", "dump", "down", "drop", "fall", "slump"}
-
-        pos = neg = neu = 0
-        scores = []
-        for t in texts:
-            low = t.lower()
-            pcount = sum(1 for w in positive_words if w in low)
-            ncount = sum(1 for w in negative_words if w in low)
-            if pcount > ncount:
-                pos += 1
-                scores.append(1.0)
-            elif ncount > pcount:
-                neg += 1
-                scores.append(-1.0)
-            else:
-                neu += 1
-                scores.append(0.0)
-
-        avg = statistics.mean(scores) if scores else 0.0
-        return {"score": avg, "positive": pos, "negative": neg, "neutral": neu}
-
-    def analyze(self, coingecko_id: str, vs_currency: str = "usd", news_api_key: Optional[str] = None) -> Dict[str, Any]:
+        # Scan every text in one pass, then bucket hits back to their source text
+        lowered = [t.lower() for t in texts]
+        offsets = np.zeros(len(lowered), dtype=np.int64)
+        np.cumsum([len(t) + len(_TEXT_SEPARATOR) for t in lowered[:-1]], out=offsets[1:])
+        starts, polarities = _sentiment_hits(_TEXT_SEPARATOR.join(lowered))
+
+        pcount = np.zeros(len(lowered), dtype=np.int64)
+        ncount = np.zeros(len(lowered), dtype=np.int64)
+        if starts:
+            owner = np.searchsorted(offsets, np.asarray(starts, dtype=np.int64), side="right") - 1
+            polarity = np.asarray(polarities, dtype=np.int8)
+            np.add.at(pcount, owner[polarity > 0], 1)
+            np.add.at(ncount, owner[polarity < 0], 1)
+
+        scores = np.sign(pcount - ncount)
+        pos = int(np.count_nonzero(scores > 0))
+        neg = int(np.count_nonzero(scores < 0))
+        neu = len(lowered) - pos - neg
+        return {"score": float(scores.mean()), "positive": pos, "negative": neg, "neutral": neu}
+
+    def analyze(self, coingecko_id: Union[str, List[str]], vs_currency: str = "usd", news_api_key: Optional[str] = None) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
         """Run the end-to-end lightweight market research flow and return a structured report.
 
         The report includes component signals and a final `recommendation` of `buy`/`hold`/`sell` with rationale.
+        Passing a list of ids runs one batched price lookup and returns a list of reports in the same order.
         """
-        report: Dict[str, Any] = {"coingecko_id": coingecko_id}
-
-        price_obs = self.fetch_price(coingecko_id, vs_currency=vs_currency)
-        report["price"] = price_obs
-
-        # Compute price sentiment from relative changes
-        change_24 = price_obs.get("change_24h_pct")
-        change_7 = price_obs.get("change_7d_pct")
-
-        signals = []
-        score = 0.0
-        # Heuristic: 24h and 7d moves
-        if change_24 is not None:
-            if change_24 > 3:
-                score += 0.5; signals.append({"signal": "24h_up", "value": change_24})
-            elif change_24 < -3:
-                score -= 0.5; signals.append({"signal": "24h_down", "value": change_24})
-
-        if change_7 is not None:
-            if change_7 > 5:
-                score += 1.0; signals.append({"signal": "7d_up", "value": change_7})
-            elif change_7 < -5:
-                score -= 1.0; signals.append({"signal": "7d_down", "value": change_7})
-
-        # Volume spike detection
-        vol = price_obs.get("avg_volume_7d")
-        if vol:
-            if vol > 0:
-                score += 0.0
-
-        # News sentiment
-        headlines = self.fetch_news_headlines(coingecko_id, news_api_key=news_api_key)
-        news_sent = self.simple_sentiment(headlines)
-        report["news_headlines"] = headlines
-        report["news_sentiment"] = news_sent
-        score += news_sent.get("score", 0.0)
-
-        # Normalize score roughly into [-3, +3] expected range
-        report["raw_score"] = score
-
-        # Map to recommendation
-        if score >= 1.0:
-            recommendation = {"action": "buy", "confidence": min(0.9, 0.3 + score / 6)}
-        elif score <= -1.0:
-            recommendation = {"action": "sell", "confidence": min(0.9, 0.3 + (-score) / 6)}
-        else:
-            recommendation = {"action": "hold", "confidence": 0.5}
-
-        report["signals"] = signals
-        report["recommendation"] = recommendation
-        report["explanation"] = (
-            "Signal components: price changes and news sentiment combined. "
-            "This is a lightweight, heuristic-driven recommendation — treat as guidance only."
+        if isinstance(coingecko_id, str):
+            return _run(self._analyze_async(coingecko_id, vs_currency, news_api_key))
+        return _run(self._analyze_many_async(list(coingecko_id), vs_currency, news_api_key))
+
+    async def _analyze_async(self, coingecko_id: str, vs_currency: str = "usd", news_api_key: Optional[str] = None) -> Dict[str, Any]:
+        # Price, chart and news requests all fan out concurrently.
+        price_obs, headlines = await asyncio.gather(
+            self._fetch_price_async(coingecko_id, vs_currency),
+            self._fetch_news_headlines_async(coingecko_id, news_api_key),
+        )
+        return self._build_reports([coingecko_id], [price_obs], [headlines])[0]
+
+    async def _analyze_many_async(self, coingecko_ids: List[str], vs_currency: str = "usd", news_api_key: Optional[str] = None) -> List[Dict[str, Any]]:
+        price_obs, *headlines = await asyncio.gather(
+            self._fetch_prices_async(coingecko_ids, vs_currency),
+            *(self._fetch_news_headlines_async(cg_id, news_api_key) for cg_id in coingecko_ids),
+        )
+        return self._build_reports(coingecko_ids, [price_obs.get(cg_id, {}) for cg_id in coingecko_ids], headlines)
+
+    def _build_reports(self, coingecko_ids: List[str], price_obs: List[Dict[str, Any]], headlines: List[List[str]]) -> List[Dict[str, Any]]:
+        news_sent = [self.simple_sentiment(h) for h in headlines]
+
+        # Heuristic: 24h and 7d moves plus news sentiment, scored for every token in one pass
+        def column(key: str) -> np.ndarray:
+            return np.asarray([p.get(key) for p in price_obs], dtype=np.float64)
+
+        kernel = _decision_kernel(
+            column("change_24h_pct"),
+            column("change_7d_pct"),
+            np.asarray([n.get("score", 0.0) for n in news_sent], dtype=np.float64),
         )
 
-        return report
+        reports = []
+        for i, cg_id in enumerate(coingecko_ids):
+            report: Dict[str, Any] = {"coingecko_id": cg_id}
+            report["price"] = price_obs[i]
+            report["news_headlines"] = headlines[i]
+            report["news_sentiment"] = news_sent[i]
+
+            # Normalize score roughly into [-3, +3] expected range
+            score = float(kernel["score"][i])
+            report["raw_score"] = score
+
+            signals = []
+            for name, key in (("24h_up", "change_24h_pct"), ("24h_down", "change_24h_pct"),
+                              ("7d_up", "change_7d_pct"), ("7d_down", "change_7d_pct")):
+                if kernel[name][i]:
+                    signals.append({"signal": name, "value": price_obs[i][key]})
+
+            recommendation = {"action": str(kernel["action"][i]), "confidence": float(kernel["confidence"][i])}
+
+            report["signals"] = signals
+            report["recommendation"] = recommendation
+            report["explanation"] = (
+                "Signal components: price changes and news sentiment combined. "
+                "This is a lightweight, heuristic-driven recommendation — treat as guidance only."
+            )
+            reports.append(report)
+
+        return reports
+
+
+@dataclass(slots=True)
+class AnalyzeInput:
+    """Typed market research inputs, parsed once from the raw `kickoff` dict."""
+
+    coingecko_id: str
+    vs_currency: str = "usd"
+    news_api_key: Optional[str] = None
+
+    @classmethod
+    def from_inputs(cls, inputs: dict) -> 'AnalyzeInput':
+        if not isinstance(inputs, dict):
+            raise ValueError("Inputs must be a dict")
+
+        coingecko_id = inputs.get("coingecko_id") or inputs.get("token") or inputs.get("id")
+        if not coingecko_id:
+            raise ValueError("`coingecko_id` (or `token`) is required for market research")
+
+        return cls(
+            coingecko_id=coingecko_id,
+            vs_currency=inputs.get("vs_currency", "usd"),
+            news_api_key=inputs.get("news_api_key") or os.getenv("NEWSAPI_KEY"),
+        )
 
 
 class CrewShim:
@@ -196,17 +450,8 @@ class CrewShim:
         self.agent = agent
 
     def kickoff(self, inputs: dict) -> 'CrewShim.Result':
-        if not isinstance(inputs, dict):
-            raise ValueError("Inputs must be a dict")
-
-        coingecko_id = inputs.get("coingecko_id") or inputs.get("token") or inputs.get("id")
-        if not coingecko_id:
-            raise ValueError("`coingecko_id` (or `token`) is required for market research")
-
-        vs = inputs.get("vs_currency", "usd")
-        news_key = inputs.get("news_api_key") or os.getenv("NEWSAPI_KEY")
-
-        report = self.agent.analyze(coingecko_id, vs_currency=vs, news_api_key=news_key)
+        inp = AnalyzeInput.from_inputs(inputs)
+        report = self.agent.analyze(inp.coingecko_id, vs_currency=inp.vs_currency, news_api_key=inp.news_api_key)
         return CrewShim.Result(raw=report)
 
 
@@ -1,15 +1,47 @@
 import os
 import re
+import atexit
 import httpx
 from typing import Tuple
 from crewai import Agent, Crew, Task
 from crewai.tools import tool
 from logging_config import get_logger
 
+logger = get_logger(__name__)
+
+try:
+    import orjson
+
+    def _json_dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+except Exception:
+    import json
+
+    def _json_dumps(obj) -> str:
+        return json.dumps(obj, separators=(",", ":"))
+
+
+# Dedicated keep-alive client for the swap service so repeated tool
+# invocations (quote -> swap -> retry) reuse the connection. Swaps build a
+# transaction server-side, hence the longer timeout.
+_SWAP_CLIENT = httpx.Client(
+    http2=True,
+    timeout=30.0,
+    limits=httpx.Limits(max_keepalive_connections=4, max_connections=8),
+    headers={"Content-Type": "application/json", "accept-encoding": "gzip"},
+)
+atexit.register(_SWAP_CLIENT.close)
+
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Helper: parse amount and slippage from user text
 # ─────────────────────────────────────────────────────────────────────────────
+_SLIPPAGE_RE = re.compile(r"slippage\s*[:\-]?\s*(\d+(?:\.\d+)?)\s*%?")
+_PERCENT_RE = re.compile(r"(\d+(?:\.\d+)?)\s*%")
+_ADA_AMOUNT_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(ada|lovelace)\b")
+_NUMBER_RE = re.compile(r"(\d+(?:\.\d+)?)")
+
+
 def parse_amount_and_slippage(text: str) -> Tuple[int, int]:
     """Parse text text to amount (lovelace) and slippage percent."""
     text = text.lower()
@@ -17,16 +49,16 @@ def parse_amount_and_slippage(text: str) -> Tuple[int, int]:
     ada_amount = None
     slippage = None
 
-    slip_match = re.search(r"slippage\s*[:\-]?\s*(\d+(?:\.\d+)?)\s*%?", text)
+    slip_match = _SLIPPAGE_RE.search(text)
     if not slip_match:
-        slip_match = re.search(r"(\d+(?:\.\d+)?)\s*%", text)
+        slip_match = _PERCENT_RE.search(text)
     if slip_match:
         try:
             slippage = float(slip_match.group(1))
         except Exception:
             slippage = None
 
-    ada_match = re.search(r"(\d+(?:\.\d+)?)\s*(ada|lovelace)\b", text)
+    ada_match = _ADA_AMOUNT_RE.search(text)
     if ada_match:
         try:
             ada_amount = float(ada_match.group(1))
@@ -34,7 +66,7 @@ def parse_amount_and_slippage(text: str) -> Tuple[int, int]:
             ada_amount = None
 
     if ada_amount is None:
-        num_match = re.search(r"(\d+(?:\.\d+)?)", text)
+        num_match = _NUMBER_RE.search(text)
         if num_match:
             try:
                 ada_amount = float(num_match.group(1))
@@ -54,7 +86,7 @@ def parse_amount_and_slippage(text: str) -> Tuple[int, int]:
 
     slippage_percent = int(round(slippage)) if slippage is not None else 1
     amount_in_lovelace = int(round(ada_amount * 1_000_000))
-    print(f"Parsed amount: {amount_in_lovelace} lovelace, slippage: {slippage_percent}%")
+    logger.debug("Parsed amount: %s lovelace, slippage: %s%%", amount_in_lovelace, slippage_percent)
     return amount_in_lovelace, slippage_percent
 
 
@@ -73,8 +105,6 @@ def swap_ada_to_min(text: str, bearer_token: str) -> str:
     Returns:
         A JSON string with the swap result including status, request payload and response.
     """
-    import json
-
     amount_in, slippage = parse_amount_and_slippage(text)
 
     payload = {
@@ -84,15 +114,12 @@ def swap_ada_to_min(text: str, bearer_token: str) -> str:
         "slippagePercent": slippage,
     }
 
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {bearer_token}",
-    }
+    headers = {"Authorization": f"Bearer {bearer_token}"}
 
     swap_url = os.getenv("MIN_SWAP_URL", "http://localhost:5001/api/swap/minswap/swap")
 
     try:
-        resp = httpx.post(swap_url, json=payload, headers=headers, timeout=30.0)
+        resp = _SWAP_CLIENT.post(swap_url, json=payload, headers=headers)
         try:
             resp_json = resp.json()
         except Exception:
@@ -105,7 +132,8 @@ def swap_ada_to_min(text: str, bearer_token: str) -> str:
     except Exception as e:
         result = {"status": "error", "error": str(e)}
 
-    return json.dumps(result, indent=2)
+    # Compact output: the result is consumed by the next agent, not a human
+    return _json_dumps(result)
 
 
 # ─────────────────────────────────────────────────────────────────────────────
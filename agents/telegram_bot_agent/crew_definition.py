@@ -1,5 +1,12 @@
 import os
+import re
+import atexit
+import asyncio
+import heapq
 import logging
+import threading
+from collections import Counter
+from dataclasses import dataclass
 from typing import List, Optional
 from logging_config import get_logger
 
@@ -9,9 +16,73 @@ try:
 except Exception:
     Bot = None
     TelegramError = Exception
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except Exception:
+    import json
+    _json_loads = json.loads
+
+try:
+    import numpy as np
+    from numba import njit
+except Exception:
+    np = None
+    njit = None
 import httpx
 
 
+# Shared pooled client: broadcasting to several chats reuses one warm
+# connection to api.telegram.org instead of paying a handshake per chat.
+_SHARED_HTTP = httpx.AsyncClient(
+    http2=True,
+    limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+    timeout=10.0,
+    headers={"accept-encoding": "gzip"},
+)
+
+# The async client's pool is bound to a single event loop, and the sync entry
+# points are called from inside FastAPI's running loop (where asyncio.run is
+# not allowed), so all requests are driven by one background loop.
+_LOOP = asyncio.new_event_loop()
+threading.Thread(target=_LOOP.run_forever, name="telegram-http", daemon=True).start()
+
+
+def _run(coro):
+    """Run `coro` on the background loop and block until it completes."""
+    return asyncio.run_coroutine_threadsafe(coro, _LOOP).result()
+
+
+atexit.register(lambda: _run(_SHARED_HTTP.aclose()))
+
+# Very simple sentence splitter and word tokenizer used by `summarize`.
+_SENT_SPLIT_RE = re.compile(r'(?<=[.!?])\s+')
+_WORD_RE = re.compile(r"\w+")
+_STOPWORDS = frozenset({
+    'the', 'and', 'is', 'in', 'to', 'of', 'a', 'for', 'that', 'on', 'with', 'as', 'are', 'it', 'this', 'by'
+})
+
+# Below this many tokens the pure-Python scorer is faster than dispatching
+# to the JIT kernel (and avoids paying its one-off compile on short texts).
+_NUMBA_MIN_TOKENS = 2000
+
+if njit is not None:
+    @njit(cache=True)
+    def _score_sentences(token_ids, offsets, freq_arr, out):
+        # Average word frequency per sentence; sentence i spans
+        # token_ids[offsets[i]:offsets[i + 1]].
+        for i in range(offsets.shape[0] - 1):
+            start = offsets[i]
+            end = offsets[i + 1]
+            acc = 0
+            for j in range(start, end):
+                acc += freq_arr[token_ids[j]]
+            out[i] = acc / max(1, end - start)
+else:
+    _score_sentences = None
+
+
 class TelegramBotAgent:
     """A simple agent that summarizes text and sends it to Telegram chats.
 
@@ -29,6 +100,7 @@ class TelegramBotAgent:
             self.logger.warning("python-telegram-bot is not installed; Telegram sending will fail until installed.")
 
         self.bot = Bot(token=self.bot_token) if self.bot_token and Bot is not None else None
+        self.http = _SHARED_HTTP
         self.logger.info("TelegramBotAgent initialized")
 
     @staticmethod
@@ -42,44 +114,51 @@ class TelegramBotAgent:
 
         This uses sentence tokenization and a simple frequency-based scoring.
         """
-        import re
-
         # Split into sentences (very simple splitter)
-        sentences = [s.strip() for s in re.split(r'(?<=[.!?])\s+', text) if s.strip()]
+        sentences = [s.strip() for s in _SENT_SPLIT_RE.split(text) if s.strip()]
         if not sentences:
             return ""
 
-        # Build frequency table for words
-        from collections import Counter
+        # Tokenize each sentence once; the same tokens feed both the
+        # frequency table and the sentence scores.
+        tokens_per_sentence = [_WORD_RE.findall(s.lower()) for s in sentences]
+        freqs = Counter(t for tokens in tokens_per_sentence for t in tokens if t not in _STOPWORDS)
 
-        words = re.findall(r"\w+", text.lower())
-        stopwords = {
-            'the', 'and', 'is', 'in', 'to', 'of', 'a', 'for', 'that', 'on', 'with', 'as', 'are', 'it', 'this', 'by'
-        }
-        freqs = Counter(w for w in words if w not in stopwords)
-
-        # Score sentences
-        def score_sentence(sent: str) -> float:
-            tokens = re.findall(r"\w+", sent.lower())
-            if not tokens:
-                return 0.0
-            score = sum(freqs.get(t, 0) for t in tokens)
-            return score / len(tokens)
-
-        scored = [(score_sentence(s), i, s) for i, s in enumerate(sentences)]
-        # Pick top sentences (preserve original order)
-        scored.sort(key=lambda x: x[0], reverse=True)
-        top = sorted(scored[:max_sentences], key=lambda x: x[1])
-        summary = " ".join(s for _, _, s in top)
+        # Score sentences by average word frequency
+        n_tokens = sum(len(tokens) for tokens in tokens_per_sentence)
+        if _score_sentences is not None and n_tokens >= _NUMBA_MIN_TOKENS:
+            scores = self._score_sentences_jit(tokens_per_sentence, freqs, n_tokens)
+        else:
+            scores = [sum(freqs[t] for t in tokens) / max(1, len(tokens)) for tokens in tokens_per_sentence]
+
+        # Pick top sentences (preserve original order); nlargest is stable, so
+        # ties still go to the earlier sentence.
+        top_idx = sorted(heapq.nlargest(max_sentences, range(len(sentences)), key=scores.__getitem__))
+        summary = " ".join(sentences[i] for i in top_idx)
         self.logger.debug(f"Generated summary (len={len(summary)}): {summary}")
         return summary
 
+    @staticmethod
+    def _score_sentences_jit(tokens_per_sentence: List[List[str]], freqs: Counter, n_tokens: int) -> List[float]:
+        """Score sentences with the numba kernel over interned integer token ids."""
+        vocab: dict = {}
+        token_ids = np.fromiter(
+            (vocab.setdefault(t, len(vocab)) for tokens in tokens_per_sentence for t in tokens),
+            dtype=np.int32,
+            count=n_tokens,
+        )
+        freq_arr = np.fromiter((freqs[w] for w in vocab), dtype=np.int32, count=len(vocab))
+        offsets = np.zeros(len(tokens_per_sentence) + 1, dtype=np.int32)
+        np.cumsum([len(tokens) for tokens in tokens_per_sentence], out=offsets[1:])
+        out = np.empty(len(tokens_per_sentence), dtype=np.float64)
+        _score_sentences(token_ids, offsets, freq_arr, out)
+        return out.tolist()
+
     def send_summary(self, summary: str, chat_ids: Optional[List[str]] = None) -> dict:
         """Send `summary` to configured Telegram chat IDs.
 
         Returns a dict with send results keyed by chat_id.
         """
-        results = {}
         chat_list = chat_ids or self.chat_ids
 
         if not self.bot_token:
@@ -87,13 +166,25 @@ class TelegramBotAgent:
             self.logger.error(msg)
             raise RuntimeError(msg)
 
-        # Use HTTP API synchronously to avoid async coroutine issues with some PTB versions
+        return _run(self._send_async(summary, chat_list))
+
+    async def _send_async(self, summary: str, chat_ids: List[str]) -> dict:
+        # Use the HTTP API directly to avoid async coroutine issues with some PTB versions.
+        # Chats are independent, so all sends are in flight at once; a failing
+        # chat is reported in its own entry without aborting the others.
         base_url = f"https://api.telegram.org/bot{self.bot_token}/sendMessage"
-        for cid in chat_list:
+        responses = await asyncio.gather(
+            *(self.http.post(base_url, json={"chat_id": cid, "text": summary}) for cid in chat_ids),
+            return_exceptions=True,
+        )
+
+        results = {}
+        for cid, resp in zip(chat_ids, responses):
             try:
-                resp = httpx.post(base_url, json={"chat_id": cid, "text": summary}, timeout=10.0)
+                if isinstance(resp, Exception):
+                    raise resp
                 if resp.status_code == 200:
-                    data = resp.json()
+                    data = _json_loads(resp.content)
                     msg_id = data.get("result", {}).get("message_id")
                     results[cid] = {"ok": True, "message_id": msg_id}
                     self.logger.info("Sent summary to chat %s", cid)
@@ -107,6 +198,20 @@ class TelegramBotAgent:
         return results
 
 
+@dataclass(slots=True)
+class SummaryInput:
+    """Typed summarize-and-send inputs, parsed once from the raw `kickoff` dict."""
+
+    text: str
+
+    @classmethod
+    def from_inputs(cls, inputs: dict) -> 'SummaryInput':
+        text = inputs.get("text") if isinstance(inputs, dict) else None
+        if not text:
+            raise ValueError("No input text provided to CrewShim.kickoff")
+        return cls(text=text)
+
+
 class CrewShim:
     """Compatibility shim that provides a `crew` object with a `kickoff` method
     so existing callsites (like `main.py`) continue to work.
@@ -120,12 +225,10 @@ class CrewShim:
         self.agent = agent
 
     def kickoff(self, inputs: dict) -> 'CrewShim.Result':
-        text = inputs.get("text") if isinstance(inputs, dict) else None
-        if not text:
-            raise ValueError("No input text provided to CrewShim.kickoff")
+        inp = SummaryInput.from_inputs(inputs)
 
         # Summarize and send
-        summary = self.agent.summarize(text)
+        summary = self.agent.summarize(inp.text)
         send_result = {}
         if self.agent.chat_ids:
             send_result = self.agent.send_summary(summary)
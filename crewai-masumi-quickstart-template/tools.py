@@ -1,8 +1,34 @@
 import os
-from typing import ClassVar, List, Union
+import atexit
+import asyncio
+import functools
+import logging
+import threading
+from urllib.parse import quote as _uq
+from decimal import ROUND_FLOOR, Decimal, InvalidOperation, localcontext
+from typing import ClassVar, Dict, List, Type, Union
+import pybreaker
+import requests
+from cachetools import LRUCache, TTLCache
 from dotenv import load_dotenv
 from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+from tenacity import (
+    before_sleep_log,
+    retry,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_exponential_jitter,
+)
 import httpx
+from logging_config import get_logger
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except Exception:
+    import json
+    _json_loads = json.loads
 
 # Charli3 Dendrite & PyCardano imports
 from charli3_dendrite.dexs.amm.minswap import MinswapCPPState, MinswapOrderDatum
@@ -11,11 +37,7 @@ from charli3_dendrite.utility import Assets
 from pycardano import (
     Address,
     BlockFrostChainContext,
-    ExtendedSigningKey,
-    HDWallet,
     Network,
-    PaymentSigningKey,
-    PaymentVerificationKey,
     TransactionBuilder,
     TransactionOutput,
     Value,
@@ -30,8 +52,105 @@ from blockfrost import ApiUrls
 
 load_dotenv()
 
+logger = get_logger(__name__)
+
+# Configuration is read once at import; a missing Blockfrost key fails at
+# startup instead of halfway through an agent's swap.
+_NETWORK = os.environ.get("NETWORK", "preprod").lower()
+_PROJECT_ID = os.environ.get("BLOCKFROST_PROJECT_ID")
+if not _PROJECT_ID:
+    raise RuntimeError("BLOCKFROST_PROJECT_ID environment variable is required.")
+
 # Preprod Minswap Configuration
 MINSWAP_PREPROD_SCRIPT_HASH = "c3e28c36c3447315ba5a56f33da6a6ddc1770a876a8d9f0cb3a97c4c"
+MIN_POLICY_ID = "29d222ce763455e3d7a09a665ce554f00ac89d2e99a1a83d267170c6" # Example
+MIN_ASSET_NAME = "4d494e" # "MIN" in hex
+
+# Decoded once at import instead of on every swap
+_MINSWAP_SCRIPT_HASH_BYTES = bytes.fromhex(MINSWAP_PREPROD_SCRIPT_HASH)
+_ORDER_ADDRESS = Address(payment_part=ScriptHash(_MINSWAP_SCRIPT_HASH_BYTES), network=Network.TESTNET)
+# Asset units are policy id (56 hex chars) + asset name
+if len(MIN_POLICY_ID) != 56:
+    raise RuntimeError("MIN_POLICY_ID must be a 56 hex char (28-byte) policy id.")
+_MIN_UNIT = f"{MIN_POLICY_ID}{MIN_ASSET_NAME}"
+_MIN_SCRIPT_HASH = ScriptHash(bytes.fromhex(MIN_POLICY_ID))
+_MIN_ASSET_NAME_OBJ = AssetName(bytes.fromhex(MIN_ASSET_NAME))
+
+# Shared HTTP/2 keep-alive client for the Minswap quote API, so concurrent
+# quote lookups multiplex over warm connections instead of re-handshaking.
+_CLIENT = httpx.AsyncClient(
+    http2=True,
+    timeout=httpx.Timeout(10.0, connect=2.0),
+    limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+    headers={"User-Agent": "cardano-hackathon/1.0"},
+)
+
+# Quotes get tight per-phase timeouts (slightly above typical latency) so a
+# dead API fails in about a second and the breaker can count it, rather than
+# every attempt waiting out the client's 10s default.
+_QUOTE_TIMEOUT = httpx.Timeout(connect=1.0, read=3.0, write=2.0, pool=1.0)
+
+# The async client's pool is bound to one event loop, and tools are invoked
+# synchronously from inside FastAPI's running loop (where asyncio.run is not
+# allowed), so all requests are driven by one background loop.
+_LOOP = asyncio.new_event_loop()
+threading.Thread(target=_LOOP.run_forever, name="tools-http", daemon=True).start()
+
+
+def _run_sync(coro):
+    """Run `coro` on the background loop and block until it completes."""
+    return asyncio.run_coroutine_threadsafe(coro, _LOOP).result()
+
+
+atexit.register(lambda: _run_sync(_CLIENT.aclose()))
+
+# Agents tend to repeat the same quote call within a planning loop; identical
+# lookups inside the TTL are served from memory instead of the network.
+_QUOTE_CACHE = TTLCache(maxsize=1024, ttl=5)
+_QUOTE_CACHE_LOCK = threading.Lock()
+
+
+# Last good quote per key, kept past the TTL so an open breaker can still
+# answer with a (clearly labelled) stale quote.
+_LAST_QUOTES = LRUCache(maxsize=1024)
+
+# Circuit breakers: after 5 consecutive failures calls fail fast for 30s
+# instead of every agent step stalling on a degraded dependency.
+_MINSWAP_CB = pybreaker.CircuitBreaker(fail_max=5, reset_timeout=30, name="minswap-api")
+_BLOCKFROST_CB = pybreaker.CircuitBreaker(fail_max=5, reset_timeout=30, name="blockfrost")
+
+# Per-dependency bulkheads: a stalled Blockfrost can hold at most a few of the
+# loop's worker threads, leaving quote lookups free to run.
+_MINSWAP_SEM = asyncio.Semaphore(16)
+_BLOCKFROST_SEM = asyncio.Semaphore(4)
+
+
+# The only pair the swap tool can build orders for
+_ADA_MIN = frozenset(("ADA", "MIN"))
+
+
+# Bounded exponential backoff with jitter for idempotent reads only (quotes,
+# chain queries); a dropped packet should not abort a whole swap plan.
+def _retry_transient(*errors):
+    return retry(
+        retry=retry_if_exception_type(errors),
+        stop=stop_after_attempt(4),
+        wait=wait_exponential_jitter(initial=0.1, max=2.0, jitter=0.1),
+        before_sleep=before_sleep_log(logger, logging.WARNING),
+        reraise=True,
+    )
+
+
+_TRANSIENT_HTTP_ERRORS = (httpx.TimeoutException, httpx.ConnectError, httpx.RemoteProtocolError)
+_TRANSIENT_BLOCKFROST_ERRORS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+
+
+def _amount_key(amount: str) -> str:
+    """Normalise `amount` exactly, so "100" and "100.0" share a cache entry but 100 and 101 never do."""
+    try:
+        return str(Decimal(str(amount)).normalize())
+    except InvalidOperation:
+        return str(amount)
 
 class PreprodMinswapCPPState(MinswapCPPState):
     """Minswap Constant Product Pool State for Preprod."""
@@ -46,38 +165,118 @@ class PreprodMinswapCPPState(MinswapCPPState):
 
     @classmethod
     def order_address(cls) -> Address:
-        # Derive address from script hash
-        script_hash = plutus_script_hash(PlutusV1Script(bytes.fromhex(MINSWAP_PREPROD_SCRIPT_HASH)))
-        return Address(payment_part=script_hash, network=Network.TESTNET)
+        return _pool_order_address()
+
+@functools.cache
+def _pool_order_address() -> Address:
+    # Derive address from script hash; the Plutus hash never changes, so compute it once
+    script_hash = plutus_script_hash(PlutusV1Script(_MINSWAP_SCRIPT_HASH_BYTES))
+    return Address(payment_part=script_hash, network=Network.TESTNET)
+
+@_retry_transient(*_TRANSIENT_HTTP_ERRORS)
+async def _get_quote_response(url: str) -> httpx.Response:
+    # Held per attempt, so retry backoff does not occupy a slot
+    async with _MINSWAP_SEM:
+        return await _CLIENT.get(url, timeout=_QUOTE_TIMEOUT)
+
+# Using Minswap API for quotes is still valid and easier than querying contract state for just a quote
+# But we should use the Preprod API if available.
+# Minswap Preprod API: https://api-preprod.minswap.org/v1/quote (Assuming standard pattern, verify if fails)
+# Minswap Mainnet API: https://api.minswap.org/v1/quote
+# Indexed by `_NETWORK != "preprod"`.
+_QUOTE_URL_TMPL = (
+    "https://api-preprod.minswap.org/v1/quote?from={b}&to={t}&amount={a}",
+    "https://api.minswap.org/v1/quote?from={b}&to={t}&amount={a}",
+)
+
+async def _minswap_quote(base_token: str, target_token: str, amount: str) -> str:
+    cache_key = ("minswap", _NETWORK, base_token, target_token, _amount_key(amount))
+    with _QUOTE_CACHE_LOCK:
+        cached = _QUOTE_CACHE.get(cache_key)
+    if cached is not None:
+        result, fee = cached
+        return f"Swap {amount} {base_token} for approximately {result} {target_token}. Fee: {fee} {base_token}."
+
+    # Escape the parameters so policy-id/asset-name units and odd tickers stay one query value each
+    url = _QUOTE_URL_TMPL[_NETWORK != "preprod"].format(b=_uq(base_token), t=_uq(target_token), a=_uq(str(amount)))
+    try:
+        with _MINSWAP_CB.calling():
+            response = await _get_quote_response(url)
+            # Server-side errors count towards tripping the breaker
+            if response.status_code >= 500:
+                response.raise_for_status()
+        if response.status_code == 200:
+            # Decode the raw bytes directly; only result and fee are read
+            data = _json_loads(response.content)
+            result = data.get('result', 'N/A')
+            fee = data.get('fee', 'N/A')
+            with _QUOTE_CACHE_LOCK:
+                _QUOTE_CACHE[cache_key] = (result, fee)
+                _LAST_QUOTES[cache_key] = (result, fee)
+            return f"Swap {amount} {base_token} for approximately {result} {target_token}. Fee: {fee} {base_token}."
+        else:
+            return f"Failed to get quote: HTTP {response.status_code} - {response.text}"
+    except pybreaker.CircuitBreakerError:
+        with _QUOTE_CACHE_LOCK:
+            last = _LAST_QUOTES.get(cache_key)
+        if last is not None:
+            result, fee = last
+            return f"Minswap API unavailable; last known quote: swap {amount} {base_token} for approximately {result} {target_token}. Fee: {fee} {base_token}."
+        return "Minswap API is temporarily unavailable. Try again later or use another route."
+    except httpx.HTTPStatusError as e:
+        # Already counted by the breaker; report it like any other non-200 reply
+        return f"Failed to get quote: HTTP {e.response.status_code} - {e.response.text}"
+    except Exception as e:
+        return f"Error fetching quote: {str(e)}"
+
+# Quote handlers keyed by lowercase DEX name; add new DEXes here
+_DEX_HANDLERS = {"minswap": _minswap_quote}
+
+async def _fetch_quote(base_token: str, target_token: str, amount: str, dex: str = "minswap") -> str:
+    """Fetch one quote and format it for the agent; shared by the single and batch quote tools."""
+    handler = _DEX_HANDLERS.get(dex.lower())
+    if handler is None:
+        return f"DEX '{dex}' not supported. Only Minswap is currently available."
+    return await handler(base_token, target_token, amount)
 
 class GetSwapQuoteTool(BaseTool):
     name: str = "get_swap_quote"
     description: str = "Fetches the swap quote from the specified DEX on Cardano. Args: base_token (str), target_token (str), amount (str), dex (str, default 'minswap'). Returns the quote details."
 
     def _run(self, base_token: str, target_token: str, amount: str, dex: str = "minswap") -> str:
-        if dex.lower() == "minswap":
-            # Using Minswap API for quotes is still valid and easier than querying contract state for just a quote
-            # But we should use the Preprod API if available. 
-            # Minswap Mainnet API: https://api.minswap.org/v1/quote
-            # Minswap Preprod API: https://api-preprod.minswap.org/v1/quote (Assuming standard pattern, verify if fails)
-            
-            network = os.environ.get("NETWORK", "preprod").lower()
-            base_url = "https://api-preprod.minswap.org/v1" if network == "preprod" else "https://api.minswap.org/v1"
-            
-            url = f"{base_url}/quote?from={base_token}&to={target_token}&amount={amount}"
-            try:
-                response = httpx.get(url, timeout=10)
-                if response.status_code == 200:
-                    data = response.json()
-                    result = data.get('result', 'N/A')
-                    fee = data.get('fee', 'N/A')
-                    return f"Swap {amount} {base_token} for approximately {result} {target_token}. Fee: {fee} {base_token}."
-                else:
-                    return f"Failed to get quote: HTTP {response.status_code} - {response.text}"
-            except Exception as e:
-                return f"Error fetching quote: {str(e)}"
-        else:
-            return f"DEX '{dex}' not supported. Only Minswap is currently available."
+        return _run_sync(self._arun(base_token, target_token, amount, dex))
+
+    async def _arun(self, base_token: str, target_token: str, amount: str, dex: str = "minswap") -> str:
+        return await _fetch_quote(base_token, target_token, amount, dex)
+
+class BatchQuoteInput(BaseModel):
+    quotes: List[Dict[str, str]] = Field(
+        ...,
+        description="Quote requests, each with base_token, target_token, amount and optional dex.",
+    )
+
+class BatchGetSwapQuotesTool(BaseTool):
+    name: str = "batch_get_swap_quotes"
+    description: str = "Fetches several swap quotes concurrently. Args: quotes (list of dicts with base_token, target_token, amount and optional dex). Returns one quote line per request, in order."
+    args_schema: Type[BaseModel] = BatchQuoteInput
+
+    def _run(self, quotes: List[Dict[str, str]]) -> str:
+        return _run_sync(self._arun(quotes))
+
+    async def _arun(self, quotes: List[Dict[str, str]]) -> str:
+        # All lookups wait on the network together; a failing or malformed
+        # request only affects its own line.
+        async def fetch(item: Dict[str, str]) -> str:
+            # Unpack inside the coroutine so bad keys surface as this item's exception
+            return await _fetch_quote(**item)
+
+        results = await asyncio.gather(*(fetch(q) for q in quotes), return_exceptions=True)
+        lines = []
+        for i, quote in enumerate(results, start=1):
+            if isinstance(quote, Exception):
+                quote = f"Error fetching quote: {str(quote)}"
+            lines.append(f"{i}. {quote}")
+        return "\n".join(lines)
 
 class GetPoolAddressTool(BaseTool):
     name: str = "get_pool_address"
@@ -92,33 +291,91 @@ class CalculateMinOutputTool(BaseTool):
 
     def _run(self, expected_output: str, slippage_percent: float = 1.0) -> str:
         try:
-            output = float(expected_output)
-            min_output = output * (1 - slippage_percent / 100)
-            return str(int(min_output))
-        except ValueError:
+            bps = int(round(float(slippage_percent) * 100))
+        except (TypeError, ValueError, OverflowError):
+            return "Invalid slippage percent."
+        try:
+            # Decimal basis-point math stays exact for lovelace amounts beyond 2**53;
+            # truncate only once slippage has been applied
+            with localcontext() as ctx:
+                ctx.prec = 60
+                min_output = Decimal(expected_output) * (10_000 - bps) / 10_000
+                return str(int(min_output.to_integral_value(rounding=ROUND_FLOOR)))
+        except (ValueError, InvalidOperation, OverflowError):
             return "Invalid expected output amount."
 
+def _assets_to_value(in_assets: Assets, coin: int = 0) -> Value:
+    """Convert dendrite `Assets` to a pycardano `Value`, adding `coin` extra lovelace."""
+    value = Value(coin=coin + in_assets["lovelace"])
+    # ADA-only orders (the common ADA->MIN case) need no multi-asset map
+    if set(in_assets.keys()) <= {"lovelace"}:
+        return value
+
+    multi_asset = MultiAsset()
+    for unit, quantity in in_assets.items():
+        if unit == "lovelace":
+            continue
+        if unit == _MIN_UNIT:
+            policy_id, asset_name = _MIN_SCRIPT_HASH, _MIN_ASSET_NAME_OBJ
+        else:
+            policy_id = ScriptHash(bytes.fromhex(unit[:56]))
+            asset_name = AssetName(bytes.fromhex(unit[56:]))
+        multi_asset.setdefault(policy_id, Asset())[asset_name] = quantity
+    value.multi_asset = multi_asset
+    return value
+
+@functools.lru_cache(maxsize=1)
+@_BLOCKFROST_CB
+@_retry_transient(*_TRANSIENT_BLOCKFROST_ERRORS)
+def _blockfrost_context(project_id: str) -> BlockFrostChainContext:
+    return BlockFrostChainContext(
+        project_id=project_id,
+        base_url=ApiUrls.preprod.value
+    )
+
+_BOOTSTRAP_LOCK = threading.Lock()
+
+def _bootstrap(project_id: str) -> BlockFrostChainContext:
+    """Return the process-wide chain context, built once so every swap reuses its HTTP session."""
+    # lru_cache alone can build twice when CrewAI calls tools from several threads at once
+    with _BOOTSTRAP_LOCK:
+        return _blockfrost_context(project_id)
+
+@_BLOCKFROST_CB
+@_retry_transient(*_TRANSIENT_BLOCKFROST_ERRORS)
+def _get_utxos(context: BlockFrostChainContext, address: Address) -> list:
+    return context.utxos(address)
+
+@_BLOCKFROST_CB
+@_retry_transient(*_TRANSIENT_BLOCKFROST_ERRORS)
+def _protocol_params(context: BlockFrostChainContext):
+    # The context caches these per epoch; fetching up front keeps builder.build off the network
+    return context.protocol_param
+
+async def _blockfrost_call(fn, *args):
+    """Run a blocking Blockfrost helper in a worker thread inside the Blockfrost bulkhead."""
+    async with _BLOCKFROST_SEM:
+        return await asyncio.to_thread(fn, *args)
+
 class MinswapSwapTool(BaseTool):
     name: str = "minswap_swap"
     description: str = "Generates an unsigned transaction for a token swap on Minswap (Cardano Preprod). Args: user_address (str), from_token (str, e.g., 'ADA'), to_token (str, e.g., 'MIN'), amount (float), slippage (float, default 0.5). Returns the unsigned transaction as CBOR hex."
 
     def _run(self, user_address: str, from_token: str, to_token: str, amount: float, slippage: float = 0.5) -> str:
-        # 1. Configuration
-        project_id = os.environ.get("BLOCKFROST_PROJECT_ID")
-        network_env = os.environ.get("NETWORK", "preprod").lower()
-
-        if not project_id:
-            return "Error: BLOCKFROST_PROJECT_ID environment variable is required."
+        return _run_sync(self._arun(user_address, from_token, to_token, amount, slippage))
 
-        if network_env != "preprod":
+    async def _arun(self, user_address: str, from_token: str, to_token: str, amount: float, slippage: float = 0.5) -> str:
+        # 1. Configuration (validated at import)
+        if _NETWORK != "preprod":
             return "Error: This tool is currently configured for Preprod only."
 
+        # Reject unsupported pairs before touching Blockfrost
+        if frozenset((from_token, to_token)) != _ADA_MIN:
+            return f"Error: Unsupported pair {from_token}/{to_token}. Only ADA and MIN are supported in this demo."
+
         try:
             # 2. Setup Context
-            context = BlockFrostChainContext(
-                project_id=project_id,
-                base_url=ApiUrls.preprod.value
-            )
+            context = await _blockfrost_call(_bootstrap, _PROJECT_ID)
             
             address = Address.from_primitive(user_address)
             
@@ -126,28 +383,20 @@ class MinswapSwapTool(BaseTool):
             # Convert amount to atomic units
             # ADA = 6 decimals
             
-            MIN_POLICY_ID = "29d222ce763455e3d7a09a665ce554f00ac89d2e99a1a83d267170c64d494e" # Example
-            MIN_ASSET_NAME = "4d494e" # "MIN" in hex
-            
+            # Go through str so e.g. 2.01 ADA is 2010000 lovelace, not 2009999
+            amount_atomic = int(Decimal(str(amount)) * 1_000_000)
             if from_token == "ADA":
-                amount_atomic = int(amount * 1_000_000)
                 in_assets = Assets(lovelace=amount_atomic)
                 # Out asset is MIN
-                out_assets = Assets(**{f"{MIN_POLICY_ID}{MIN_ASSET_NAME}": 0}) 
-            elif from_token == "MIN":
-                amount_atomic = int(amount * 1_000_000) # Assuming 6 decimals for MIN
-                in_assets = Assets(**{f"{MIN_POLICY_ID}{MIN_ASSET_NAME}": amount_atomic})
-                out_assets = Assets(lovelace=0)
+                out_assets = Assets(**{_MIN_UNIT: 0})
             else:
-                return f"Error: Unsupported token {from_token}. Only ADA and MIN are supported in this demo."
+                # Assuming 6 decimals for MIN
+                in_assets = Assets(**{_MIN_UNIT: amount_atomic})
+                out_assets = Assets(lovelace=0)
 
             # 4. Create Order Datum
-            # Derive Preprod Order Address
-            order_script_hash = "c3e28c36c3447315ba5a56f33da6a6ddc1770a876a8d9f0cb3a97c4c"
-            order_address = Address(
-                payment_part=bytes.fromhex(order_script_hash), 
-                network=Network.TESTNET
-            )
+            # Preprod order address is derived once at import
+            order_address = _ORDER_ADDRESS
 
             # Batcher fee and deposit
             batcher_fee = Assets(lovelace=2_000_000) # 2 ADA
@@ -163,37 +412,19 @@ class MinswapSwapTool(BaseTool):
             )
 
             # 5. Build Unsigned Transaction
+            # UTxO lookup and protocol params are independent Blockfrost calls, so overlap them
+            utxos, _ = await asyncio.gather(
+                _blockfrost_call(_get_utxos, context, address),
+                _blockfrost_call(_protocol_params, context),
+            )
             builder = TransactionBuilder(context)
-            builder.add_input_address(address)
-            
-            # Get UTXOs for the address
-            utxos = context.get_utxos(address)
-            builder.selectUtxosFrom(utxos)
+            # Offer the prefetched UTxOs for selection rather than add_input_address,
+            # which would make build() query them again; script outputs are skipped as it does
+            builder.potential_inputs.extend(u for u in utxos if u.output.script is None)
             
             # Add output to order address with datum
             # Amount sent to order address = in_assets + batcher_fee + deposit
-            total_value = Value(coin=batcher_fee.lovelace + deposit.lovelace)
-            
-            if "lovelace" in in_assets.__root__:
-                total_value.coin += in_assets.__root__["lovelace"]
-            
-            # Handle non-ADA assets in in_assets
-            multi_asset = MultiAsset()
-            has_tokens = False
-            
-            for policy, asset_dict in in_assets.__root__.items():
-                if policy != "lovelace":
-                    # policy is hex string
-                    policy_id = ScriptHash(bytes.fromhex(policy))
-                    asset_map = Asset()
-                    for asset_name_hex, quantity in asset_dict.items():
-                        asset_name = AssetName(bytes.fromhex(asset_name_hex))
-                        asset_map[asset_name] = quantity
-                    multi_asset[policy_id] = asset_map
-                    has_tokens = True
-            
-            if has_tokens:
-                total_value.multi_asset = multi_asset
+            total_value = _assets_to_value(in_assets, coin=batcher_fee["lovelace"] + deposit["lovelace"])
 
             builder.add_output(
                 TransactionOutput(
@@ -203,11 +434,15 @@ class MinswapSwapTool(BaseTool):
                 )
             )
             
-            # Build unsigned transaction
-            unsigned_tx = builder.build(change_address=address)
+            # Build unsigned transaction. Signing and submission happen outside
+            # this tool and must never be retried blindly: a resubmitted tx can
+            # double-spend or fail on already-consumed inputs.
+            unsigned_tx = await asyncio.to_thread(builder.build, change_address=address)
             
             return unsigned_tx.to_cbor().hex()
 
+        except pybreaker.CircuitBreakerError:
+            return "Error: Blockfrost is temporarily unavailable. Try again later."
         except Exception as e:
-            print(e);
+            logger.exception("Error generating swap transaction")
             return f"Error generating swap transaction: {str(e)}"
\ No newline at end of file